@@ -9,21 +9,98 @@ and converts them to OrcaSlicer-compatible format.
 import argparse
 import json
 import logging
+import os
 import re
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Set
+from typing import Any, Dict, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from slicer_profile_common import (
+    dumps_like_json, iter_matching_files, parse_json,
+)
 
 # Constants
 DEFAULT_SOURCE = "~/.config/AnycubicSlicerNext/system/Anycubic/"
 DEFAULT_OUTPUT = "~/.config/OrcaSlicer/user/default/"
 DEFAULT_FILTER = "**/*.json"
 DEFAULT_PREFIX = "Original "
+DEFAULT_JOBS = os.cpu_count() or 1
 MAX_INHERITANCE_DEPTH = 5
 
 # Regex patterns
-NOZZLE_PATTERN = re.compile(r"(\d+\.\d+) nozzle", re.IGNORECASE)
-PRINTER_NAME_PATTERN = re.compile(r"(?:.*@)?\s*(.*?)\s*\d+\.\d+\s*nozzle", re.IGNORECASE)
+# Printer name and nozzle diameter, e.g. "PLA @Anycubic Kobra S1 0.4 nozzle.json"
+FILENAME_PATTERN = re.compile(
+    r"(?:.*@)?\s*(?P<printer>.*?)\s*(?P<nozzle>\d+\.\d+)\s*nozzle", re.IGNORECASE
+)
+
+# Outcomes of migrating a single file
+RESULT_WRITTEN = "written"
+RESULT_COPIED = "copied"
+RESULT_SKIPPED = "skipped"
+RESULT_ERROR = "error"
+
+
+def _parse_profile_name(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract (printer name, nozzle diameter) from a profile filename.
+
+    Handles the common "<name> @<printer> <d.d> nozzle" shape with plain
+    string scans and falls back to FILENAME_PATTERN for anything else, so
+    the result is always the same as a FILENAME_PATTERN search.
+    """
+    lower = name.lower()
+    nozzle = lower.find("nozzle")
+    # Cheap substring test first, the pattern can only match with "nozzle"
+    if nozzle < 0:
+        return None
+
+    # Fast path: "<digits>.<digits> nozzle" at the first "nozzle", with no
+    # "@" after the number (the pattern strips up to the last "@")
+    if nozzle > 0 and name[nozzle - 1] == " " and len(lower) == len(name) and "\n" not in name:
+        end = nozzle - 1
+        dot = end
+        while dot > 0 and name[dot - 1].isdecimal():
+            dot -= 1
+        dot -= 1
+        if dot > 0 and dot < end - 1 and name[dot] == ".":
+            start = dot
+            while start > 0 and name[start - 1].isdecimal():
+                start -= 1
+            at = name.rfind("@")
+            if start < dot and at < start:
+                return name[at + 1:start].strip(), name[start:end]
+
+    match = FILENAME_PATTERN.search(name)
+    return (match.group("printer").strip(), match.group("nozzle")) if match else None
+
+
+def _load_json_file(path: str) -> Any:
+    """Parse a JSON file, using orjson or msgspec when installed."""
+    with open(path, "rb") as f:
+        return parse_json(f.read())
+
+
+# Migrator instance of a worker process, set up by _init_worker
+_worker_migrator: Optional["ProfileMigrator"] = None
+
+
+def _init_worker(migrator: "ProfileMigrator", debug: bool) -> None:
+    """Initialize a worker process of the migration pool."""
+    global _worker_migrator
+    setup_logging(debug)
+    _worker_migrator = migrator
+
+
+def _migrate_file(file_path: str) -> str:
+    """Migrate a single file in a worker process."""
+    return _worker_migrator._process_file(file_path)
 
 
 class ProfileMigrator:
@@ -38,16 +115,36 @@ class ProfileMigrator:
         filter_pattern: str = DEFAULT_FILTER,
         overwrite: bool = False,
         sort_keys: bool = False,
+        jobs: int = 1,
     ):
         self.source = source.expanduser().resolve()
         self.output = output.expanduser().resolve()
+        # String forms for cheap per-file path arithmetic
+        self._source_prefix = os.path.join(str(self.source), "")
+        self._output_str = str(self.output)
         self.prefix = prefix
         self.postfix = postfix
         self.filter_pattern = filter_pattern
         self.overwrite = overwrite
         self.sort_keys = sort_keys
+        self.jobs = max(1, jobs)
+        self._encode = json.JSONEncoder(
+            indent=4, ensure_ascii=False, sort_keys=sort_keys
+        ).encode
+        if orjson is not None:
+            self._orjson_options = orjson.OPT_INDENT_2 | (
+                orjson.OPT_SORT_KEYS if sort_keys else 0
+            )
         self.logger = logging.getLogger(__name__)
         self._processed_files: Set[Path] = set()
+        # Parsed profiles (processed and inherited), shared read-only
+        self._profile_cache: Dict[str, Dict[str, Any]] = {}
+        # Fully resolved parents by (path, depth), shared read-only as well
+        self._resolved_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        # (printer name, nozzle diameter) parsed from a filename
+        self._filename_cache: Dict[str, Optional[Tuple[str, str]]] = {}
+        # Output directories already created during this run
+        self._created_dirs: Set[Path] = set()
 
     def run(self) -> int:
         """Execute the migration process."""
@@ -61,64 +158,100 @@ class ProfileMigrator:
         self.logger.info(f"Prefix: '{self.prefix}', Postfix: '{self.postfix}'")
 
         # Find all matching files
-        matching_files = list(self.source.glob(self.filter_pattern))
+        try:
+            # Plain strings are cheaper to collect and to send to workers
+            matching_files = list(
+                iter_matching_files(str(self.source), self.filter_pattern)
+            )
+        except ValueError as e:
+            self.logger.error(str(e))
+            return 1
         self.logger.info(f"Found {len(matching_files)} files matching filter")
 
-        processed_count = 0
-        error_count = 0
-
-        for file_path in matching_files:
-            if file_path.is_file():
-                try:
-                    if file_path.suffix.lower() == ".json":
-                        self._process_json_file(file_path)
-                    else:
-                        self._copy_file(file_path)
-                    processed_count += 1
-                except Exception as e:
-                    self.logger.error(f"Error processing {file_path}: {e}", exc_info=True)
-                    error_count += 1
+        jobs = min(self.jobs, len(matching_files))
+        if jobs > 1:
+            # Files are independent, so they can be migrated in parallel
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=_init_worker, initargs=(self, debug)
+            ) as executor:
+                chunksize = max(1, len(matching_files) // (jobs * 4))
+                results = list(
+                    executor.map(_migrate_file, matching_files, chunksize=chunksize)
+                )
+        else:
+            results = [self._process_file(file_path) for file_path in matching_files]
+
+        error_count = results.count(RESULT_ERROR)
+        processed_count = len(results) - error_count
 
+        # Per-file messages are debug output, only the totals are logged here
+        self.logger.info(
+            f"Wrote {results.count(RESULT_WRITTEN)} files, "
+            f"copied {results.count(RESULT_COPIED)} files"
+        )
         self.logger.info(
             f"Migration complete. Processed: {processed_count}, Errors: {error_count}"
         )
         return 0 if error_count == 0 else 1
 
-    def _process_json_file(self, file_path: Path) -> None:
+    def _process_file(self, file_path: str) -> str:
+        """Migrate a single file. Returns one of the RESULT_* outcomes."""
+        try:
+            # Same as suffix.lower() == ".json" (a bare ".json" has no suffix)
+            name = os.path.basename(file_path)
+            if len(name) > 5 and name[-5:].lower() == ".json":
+                return self._process_json_file(file_path)
+            return self._copy_file(file_path)
+        except Exception as e:
+            # Include the traceback only with --debug
+            self.logger.error(
+                "Error processing %s: %s", file_path, e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
+            return RESULT_ERROR
+
+    def _process_json_file(self, file_path: str) -> str:
         """Process a JSON profile file."""
-        self.logger.debug(f"Processing JSON file: {file_path}")
+        self.logger.debug("Processing JSON file: %s", file_path)
 
-        # Read and parse JSON
+        # Read and parse JSON, unless it was already loaded as a parent
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self._profile_cache.get(file_path)
+            if data is None:
+                data = _load_json_file(file_path)
+                # Later children inheriting from this file reuse the parse
+                self._profile_cache[file_path] = data
         except json.JSONDecodeError as e:
             self.logger.error(f"Invalid JSON in {file_path}: {e}")
-            return
+            return RESULT_SKIPPED
         except Exception as e:
             self.logger.error(f"Failed to read {file_path}: {e}")
-            return
+            return RESULT_SKIPPED
 
         # Skip machine_model files
         if data.get("type") == "machine_model":
-            self.logger.debug(f"Skipping machine_model file: {file_path}")
-            return
-
-        # Resolve inheritance
-        try:
-            resolved_data = self._resolve_inheritance(file_path, data)
-        except Exception as e:
-            self.logger.error(f"Failed to resolve inheritance for {file_path}: {e}")
-            return
+            self.logger.debug("Skipping machine_model file: %s", file_path)
+            return RESULT_SKIPPED
+
+        # Resolve inheritance (always yields a new dict, the parsed one is cached)
+        if data.get("inherits"):
+            try:
+                resolved_data = self._resolve_inheritance(file_path, data)
+            except Exception as e:
+                self.logger.error(f"Failed to resolve inheritance for {file_path}: {e}")
+                return RESULT_SKIPPED
+        else:
+            resolved_data = dict(data)
 
         # Apply transformations
         self._apply_transformations(resolved_data, file_path)
 
         # Write output
-        self._write_output(file_path, resolved_data)
+        return self._write_output(file_path, resolved_data)
 
     def _resolve_inheritance(
-        self, file_path: Path, data: Dict[str, Any], depth: int = 0
+        self, file_path: str, data: Dict[str, Any], depth: int = 0
     ) -> Dict[str, Any]:
         """Recursively resolve inheritance in JSON data."""
         if depth > MAX_INHERITANCE_DEPTH:
@@ -132,30 +265,34 @@ class ProfileMigrator:
             return data
 
         # Find inherited file
-        inherited_file = file_path.parent / f"{inherits_value}.json"
+        inherited_file = os.path.join(
+            os.path.dirname(file_path), f"{inherits_value}.json"
+        )
 
-        if not inherited_file.exists():
-            self.logger.warning(
-                f"Inherited file not found: {inherited_file} (referenced by {file_path})"
-            )
-            data["inherits"] = ""
-            return data
+        # Siblings usually share their parents, so each chain is resolved once
+        cache_key = (inherited_file, depth + 1)
+        resolved_inherited = self._resolved_cache.get(cache_key)
+        if resolved_inherited is None:
+            # Load inherited file
+            try:
+                inherited_data = self._load_inherited_file(inherited_file)
+            except FileNotFoundError:
+                self.logger.warning(
+                    f"Inherited file not found: {inherited_file} (referenced by {file_path})"
+                )
+                # Copy instead of mutating: data may be a cached inherited file
+                return {**data, "inherits": ""}
+            except Exception as e:
+                self.logger.warning(
+                    f"Failed to load inherited file {inherited_file}: {e}"
+                )
+                return {**data, "inherits": ""}
 
-        # Load inherited file
-        try:
-            with open(inherited_file, "r", encoding="utf-8") as f:
-                inherited_data = json.load(f)
-        except Exception as e:
-            self.logger.warning(
-                f"Failed to load inherited file {inherited_file}: {e}"
+            # Recursively resolve inherited file
+            resolved_inherited = self._resolve_inheritance(
+                inherited_file, inherited_data, depth + 1
             )
-            data["inherits"] = ""
-            return data
-
-        # Recursively resolve inherited file
-        resolved_inherited = self._resolve_inheritance(
-            inherited_file, inherited_data, depth + 1
-        )
+            self._resolved_cache[cache_key] = resolved_inherited
 
         # Merge: inherited values first, then override with current values
         merged_data = self._merge_data(resolved_inherited, data)
@@ -163,22 +300,33 @@ class ProfileMigrator:
 
         return merged_data
 
+    def _load_inherited_file(self, inherited_file: str) -> Dict[str, Any]:
+        """
+        Load an inherited JSON file, parsing each file only once per run.
+
+        The returned dict is shared between all profiles inheriting from it
+        and must not be modified.
+        """
+        data = self._profile_cache.get(inherited_file)
+        if data is None:
+            data = _load_json_file(inherited_file)
+            self._profile_cache[inherited_file] = data
+        return data
+
     def _merge_data(
         self, base: Dict[str, Any], override: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Merge two dictionaries, with override values taking precedence."""
-        result = base.copy()
-
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+        # Only keys present on both sides can shadow a nested object
+        for key in base.keys() & override.keys():
+            if isinstance(override[key], dict) and isinstance(base[key], dict):
                 self.logger.warning(
                     f"Nested object detected for key '{key}'. Performing shallow merge."
                 )
-            result[key] = value
 
-        return result
+        return {**base, **override}
 
-    def _apply_transformations(self, data: Dict[str, Any], file_path: Path) -> None:
+    def _apply_transformations(self, data: Dict[str, Any], file_path: str) -> None:
         """Apply required transformations to the profile data."""
         # Set required fields
         data["is_custom_defined"] = "0"
@@ -196,45 +344,37 @@ class ProfileMigrator:
             data["support_multi_bed_types"] = "1"
 
     def _set_compatible_printers_condition(
-        self, data: Dict[str, Any], file_path: Path
+        self, data: Dict[str, Any], file_path: str
     ) -> None:
         """Set the compatible_printers_condition field."""
+        file_name = os.path.basename(file_path)
         existing_value = data.get("compatible_printers_condition")
 
         # If field doesn't exist, don't set it
         if "compatible_printers_condition" not in data:
             self.logger.debug(
-                f"compatible_printers_condition not present in {file_path.name}, skipping"
+                "compatible_printers_condition not present in %s, skipping",
+                file_name,
             )
             return
 
         # If it has a non-empty value, warn and skip
         if existing_value and existing_value != "":
             self.logger.warning(
-                f"compatible_printers_condition already set in {file_path.name}: '{existing_value}'"
+                f"compatible_printers_condition already set in {file_name}: '{existing_value}'"
             )
             return
 
-        # Extract nozzle diameter from filename
-        nozzle_match = NOZZLE_PATTERN.search(file_path.name)
-        if not nozzle_match:
+        # Extract printer name and nozzle diameter from filename
+        parsed = self._parse_filename(file_name)
+        if parsed is None:
             self.logger.warning(
-                f"No nozzle diameter found in filename: {file_path.name}. "
+                f"No nozzle diameter found in filename: {file_name}. "
                 "Skipping compatible_printers_condition."
             )
             return
 
-        nozzle_diameter = nozzle_match.group(1)
-
-        # Extract printer name from filename
-        printer_match = PRINTER_NAME_PATTERN.search(file_path.name)
-        if not printer_match:
-            self.logger.warning(
-                f"Could not extract printer name from filename: {file_path.name}"
-            )
-            return
-
-        printer_name = printer_match.group(1).strip()
+        printer_name, nozzle_diameter = parsed
 
         # Set the value with proper escaping
         condition = (
@@ -244,57 +384,103 @@ class ProfileMigrator:
         data["compatible_printers_condition"] = condition
 
         self.logger.debug(
-            f"Set compatible_printers_condition for {file_path.name}: {condition}"
+            "Set compatible_printers_condition for %s: %s", file_name, condition
         )
 
-    def _copy_file(self, file_path: Path) -> None:
+    def _parse_filename(self, filename: str) -> Optional[Tuple[str, str]]:
+        """Extract (printer name, nozzle diameter) from a profile filename."""
+        try:
+            return self._filename_cache[filename]
+        except KeyError:
+            pass
+
+        parsed = _parse_profile_name(filename)
+        self._filename_cache[filename] = parsed
+        return parsed
+
+    def _copy_file(self, file_path: str) -> str:
         """Copy a non-JSON file to the output directory."""
         output_path = self._get_output_path(file_path)
 
         if output_path.exists() and not self.overwrite:
             self.logger.warning(f"Output file exists, skipping: {output_path}")
-            return
+            return RESULT_SKIPPED
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(output_path.parent)
 
-        with open(file_path, "rb") as src, open(output_path, "wb") as dst:
-            dst.write(src.read())
+        shutil.copyfile(file_path, output_path)
 
-        self.logger.info(f"Copied: {file_path.name} -> {output_path}")
+        self.logger.debug("Copied: %s -> %s", os.path.basename(file_path), output_path)
+        return RESULT_COPIED
 
-    def _write_output(self, file_path: Path, data: Dict[str, Any]) -> None:
+    def _write_output(self, file_path: str, data: Dict[str, Any]) -> str:
         """Write processed JSON data to output file."""
         output_path = self._get_output_path(file_path)
+        # Exclusive creation fails if the file exists, no separate stat() needed
+        mode = "wb" if self.overwrite else "xb"
 
-        if output_path.exists() and not self.overwrite:
+        try:
+            # Opened before serializing, so existing outputs are skipped cheaply
+            try:
+                f = open(output_path, mode)
+            except FileNotFoundError:
+                self._ensure_dir(output_path.parent)
+                f = open(output_path, mode)
+        except FileExistsError:
             self.logger.warning(f"Output file exists, skipping: {output_path}")
-            return
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+            return RESULT_SKIPPED
+        except Exception as e:
+            self.logger.error(f"Failed to write {output_path}: {e}")
+            return RESULT_SKIPPED
 
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False, sort_keys=self.sort_keys)
-            self.logger.info(f"Wrote: {file_path.name} -> {output_path}")
+            with f:
+                # Written with a single write()
+                f.write(self._serialize(data))
         except Exception as e:
             self.logger.error(f"Failed to write {output_path}: {e}")
-
-    def _get_output_path(self, file_path: Path) -> Path:
+            # Don't leave a truncated profile behind
+            output_path.unlink(missing_ok=True)
+            return RESULT_SKIPPED
+
+        self.logger.debug("Wrote: %s -> %s", os.path.basename(file_path), output_path)
+        return RESULT_WRITTEN
+
+    def _serialize(self, data: Dict[str, Any]) -> bytes:
+        """Encode data as 4-space indented UTF-8 JSON."""
+        if orjson is not None:
+            buf = dumps_like_json(data, self._orjson_options)
+            if buf is not None:
+                return buf
+        return self._encode(data).encode("utf-8")
+
+    def _ensure_dir(self, directory: Path) -> None:
+        """Create a directory (and parents) once per run."""
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def _get_output_path(self, file_path: str) -> Path:
         """Calculate the output path for a file."""
-        # Get relative path from source
-        try:
-            relative_path = file_path.relative_to(self.source)
-        except ValueError:
+        # Get relative directory from source (files come from walking the
+        # source, so a string prefix check replaces Path.relative_to)
+        if file_path.startswith(self._source_prefix):
+            relative_dir, name = os.path.split(file_path[len(self._source_prefix):])
+        else:
             # File is not relative to source, use just the filename
-            relative_path = Path(file_path.name)
-
-        # Apply prefix and postfix
-        stem = file_path.stem
-        suffix = file_path.suffix
+            relative_dir, name = "", os.path.basename(file_path)
+
+        # Apply prefix and postfix (split like Path.stem/Path.suffix, which
+        # unlike os.path.splitext keep a trailing dot in the stem)
+        dot = name.rfind(".")
+        if 0 < dot < len(name) - 1:
+            stem, suffix = name[:dot], name[dot:]
+        else:
+            stem, suffix = name, ""
         new_name = f"{self.prefix}{stem}{self.postfix}{suffix}"
 
         # Construct output path
-        output_path = self.output / relative_path.parent / new_name
+        output_path = Path(self._output_str, relative_dir, new_name)
         return output_path
 
 
@@ -368,6 +554,13 @@ def parse_arguments() -> argparse.Namespace:
         help="Sort JSON keys alphabetically in output (default: False)",
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files processed in parallel (default: {DEFAULT_JOBS})",
+    )
+
     parser.add_argument(
         "-i", "--interactive",
         action="store_true",
@@ -404,6 +597,9 @@ def interactive_mode() -> argparse.Namespace:
     sort_input = input(f"Sort JSON keys alphabetically? [y/N]: ").strip().lower()
     sort_keys = sort_input in ("y", "yes")
 
+    jobs_input = input(f"Parallel jobs [{DEFAULT_JOBS}]: ").strip()
+    jobs = int(jobs_input) if jobs_input.isdigit() else DEFAULT_JOBS
+
     # Create namespace object
     args = argparse.Namespace(
         source=source,
@@ -414,6 +610,7 @@ def interactive_mode() -> argparse.Namespace:
         overwrite=overwrite,
         debug=debug,
         sort=sort_keys,
+        jobs=jobs,
         interactive=True,
     )
 
@@ -441,6 +638,7 @@ def main() -> int:
         filter_pattern=args.filter,
         overwrite=args.overwrite,
         sort_keys=args.sort,
+        jobs=args.jobs,
     )
 
     try:
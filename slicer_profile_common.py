@@ -0,0 +1,261 @@
+"""
+Helpers shared by migrate_slicer_profiles.py and update_slicer_profiles.py.
+
+Covers finding profile files by glob pattern and reading/writing JSON the
+way both tools do (optional orjson/msgspec backends, 4-space indentation).
+"""
+
+import fnmatch
+import functools
+import json
+import math
+import os
+import re
+from pathlib import PurePath
+from typing import Any, Callable, Iterator, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Second choice for parsing when orjson is not installed
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Shared decoder for documents the fast decoder can't take
+JSON_DECODER = json.JSONDecoder()
+
+# Fast decoder (orjson, else msgspec) and the errors that send a document on
+# to JSON_DECODER. Both reject NaN/Infinity, which the json module accepts.
+if orjson is not None:
+    FAST_DECODE: Optional[Callable[[bytes], Any]] = orjson.loads
+    FAST_DECODE_ERRORS: Tuple[type, ...] = (orjson.JSONDecodeError,)
+elif msgspec is not None:
+    FAST_DECODE = msgspec.json.Decoder().decode
+    FAST_DECODE_ERRORS = (msgspec.DecodeError,)
+else:
+    FAST_DECODE = None
+    FAST_DECODE_ERRORS = ()
+
+# Integer literals orjson/msgspec can't hold in 64 bits (they read them as floats)
+WIDE_INTEGER_PATTERN = re.compile(rb"\d{19}")
+
+# Exponent notation, which orjson writes differently than the json module
+FLOAT_EXPONENT_PATTERN = re.compile(rb"\d[eE][-+]?\d")
+
+# Floats below this magnitude are written in exponent notation by the json
+# module, orjson only switches to it below 1e-5
+JSON_EXPONENT_THRESHOLD = 1e-4
+
+# Glob handling (same case sensitivity as Path.glob on this platform)
+RECURSIVE_WILDCARD = "**"
+GLOB_MAGIC = re.compile(r"[*?[]")
+GLOB_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+
+def _split_glob_prefix(pattern: str) -> Tuple[str, str]:
+    """
+    Split a glob pattern into its literal leading directories and the rest.
+
+    The last component always stays in the remainder, so the remainder is
+    never empty. E.g. "machine/*S1*.json" -> ("machine", "*S1*.json").
+    """
+    pure = PurePath(pattern)
+    if pure.anchor:
+        # Rejected by _compile_filter
+        return "", pattern
+
+    parts = pure.parts
+    literal_count = 0
+    for part in parts[:-1]:
+        if GLOB_MAGIC.search(part):
+            break
+        literal_count += 1
+
+    if literal_count == 0:
+        return "", pattern
+    return os.path.join(*parts[:literal_count]), os.path.join(*parts[literal_count:])
+
+
+def match_star_glob(head: str, middle: Tuple[str, ...], tail: str, min_len: int, name: str) -> bool:
+    """
+    Match a glob made of literals and "*" wildcards only, split at the "*"s.
+
+    Bind the pattern pieces with functools.partial, min_len being the
+    combined length of all pieces.
+    """
+    if len(name) < min_len or not name.startswith(head) or not name.endswith(tail):
+        return False
+    # Leftmost placement of each literal piece leaves the most room for the rest
+    pos = len(head)
+    end = len(name) - len(tail)
+    for piece in middle:
+        pos = name.find(piece, pos, end)
+        if pos < 0:
+            return False
+        pos += len(piece)
+    return True
+
+
+def _compile_component(part: str) -> Callable[[str], Any]:
+    """
+    Compile a single glob component into a name matcher.
+
+    Components using only "*" wildcards are matched with plain string
+    operations in linear time; anything else falls back to the regex
+    produced by fnmatch.translate.
+    """
+    if "?" in part or "[" in part:
+        return re.compile(fnmatch.translate(part), GLOB_FLAGS).fullmatch
+
+    fold = str.lower if GLOB_FLAGS & re.IGNORECASE else None
+    if fold:
+        part = fold(part)
+
+    if "*" not in part:
+        # No wildcard at all
+        if fold:
+            return lambda name: fold(name) == part
+        return part.__eq__
+
+    head, *middle, tail = part.split("*")
+    middle = tuple(piece for piece in middle if piece)
+    min_len = len(head) + len(tail) + sum(map(len, middle))
+    match = functools.partial(match_star_glob, head, middle, tail, min_len)
+    if fold:
+        return lambda name: match(fold(name))
+    return match
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_filter(pattern: str) -> Tuple[Union[str, Callable[[str], Any]], ...]:
+    """Compile a glob pattern into one matcher per path component."""
+    pure = PurePath(pattern)
+    if pure.anchor:
+        raise ValueError(f"Non-relative filter patterns are unsupported: {pattern}")
+    if not pure.parts:
+        raise ValueError(f"Unacceptable filter pattern: {pattern!r}")
+
+    return tuple(
+        part if part == RECURSIVE_WILDCARD else _compile_component(part)
+        for part in pure.parts
+    )
+
+
+def iter_matching_files(root: str, pattern: str) -> Iterator[str]:
+    """
+    Yield paths of files below root matching the glob pattern.
+
+    Follows Path.glob semantics ("**" spans zero or more directories, other
+    wildcards stay within a single path component) but walks the tree with
+    os.scandir, so no intermediate Path objects or extra stat() calls are made.
+    """
+    # Literal leading directories are joined instead of scanned for
+    literal_prefix, pattern = _split_glob_prefix(pattern)
+    if literal_prefix:
+        root = os.path.join(root, literal_prefix)
+
+    parts = _compile_filter(pattern)
+    last = len(parts) - 1
+    # Several "**" components can reach the same file via different routes
+    seen: Optional[Set[str]] = set() if parts.count(RECURSIVE_WILDCARD) > 1 else None
+
+    stack = [(root, 0)]
+    while stack:
+        directory, idx = stack.pop()
+        part = parts[idx]
+
+        if part == RECURSIVE_WILDCARD:
+            # "**" as the last component only matches directories
+            if idx == last:
+                continue
+            stack.append((directory, idx + 1))
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if part == RECURSIVE_WILDCARD:
+                            if entry.is_dir() and not entry.is_symlink():
+                                stack.append((entry.path, idx))
+                        elif part(entry.name):
+                            if idx < last:
+                                if entry.is_dir():
+                                    stack.append((entry.path, idx + 1))
+                            elif entry.is_file():
+                                if seen is not None:
+                                    if entry.path in seen:
+                                        continue
+                                    seen.add(entry.path)
+                                yield entry.path
+                    except OSError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
+def parse_json(raw: bytes) -> Any:
+    """Parse UTF-8 encoded JSON, using orjson or msgspec when installed."""
+    if FAST_DECODE is not None and not WIDE_INTEGER_PATTERN.search(raw):
+        try:
+            return FAST_DECODE(raw)
+        except FAST_DECODE_ERRORS:
+            # NaN/Infinity and lone surrogate escapes are left to the json
+            # module, which also reports invalid files as json.JSONDecodeError
+            pass
+    return JSON_DECODER.decode(raw.decode("utf-8"))
+
+
+def widen_indent(buf: bytes) -> bytes:
+    """
+    Turn 2-space indented JSON (orjson's only choice) into 4-space indentation.
+
+    Indents are swapped for NUL placeholders from the deepest level up, so a
+    shallower level never matches a prefix of an already handled line. Raw
+    control characters can't occur in JSON text, so the placeholders are
+    unambiguous.
+    """
+    depth = 1
+    while b"\n" + b"  " * depth in buf:
+        depth += 1
+    for level in range(depth - 1, 0, -1):
+        buf = buf.replace(b"\n" + b"  " * level, b"\n" + b"\0" * level)
+    return buf.replace(b"\0", b"    ")
+
+
+def _has_float_orjson_mangles(value: Any) -> bool:
+    """Check whether value holds, at any depth, a float orjson writes differently."""
+    if isinstance(value, float):
+        return not math.isfinite(value) or 0 < abs(value) < JSON_EXPONENT_THRESHOLD
+    if isinstance(value, dict):
+        return any(_has_float_orjson_mangles(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_float_orjson_mangles(item) for item in value)
+    return False
+
+
+def dumps_like_json(data: Any, option: int) -> Optional[bytes]:
+    """
+    Serialize data with orjson into the 4-space indented bytes json.dumps gives.
+
+    option must include orjson.OPT_INDENT_2. Returns None when orjson is not
+    installed or its output would differ from the json module's: for data
+    orjson can't encode, for floats either of them writes in exponent notation
+    and for NaN/Infinity, which orjson writes as null. The caller then encodes
+    with the json module.
+    """
+    if orjson is None:
+        return None
+    try:
+        buf = orjson.dumps(data, option=option)
+    except orjson.JSONEncodeError:
+        return None
+    if FLOAT_EXPONENT_PATTERN.search(buf):
+        return None
+    # Only walk the data when the output has a spot orjson may have mangled
+    if (b"0.0000" in buf or b"null" in buf) and _has_float_orjson_mangles(data):
+        return None
+    return widen_indent(buf)
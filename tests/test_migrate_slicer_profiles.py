@@ -0,0 +1,51 @@
+"""Tests for migrate_slicer_profiles.py."""
+
+import json
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import migrate_slicer_profiles  # noqa: E402
+
+
+class WriteOutputTest(unittest.TestCase):
+    """Written profiles must match json.dumps(..., indent=4) byte for byte."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = Path(tmp.name) / "source"
+        self.output = Path(tmp.name) / "output"
+        self.source.mkdir()
+        self.migrator = migrate_slicer_profiles.ProfileMigrator(self.source, self.output)
+
+    def assert_written_like_json(self, data):
+        source_file = self.source / "process" / "profile.json"
+        result = self.migrator._write_output(str(source_file), data)
+        self.assertEqual(result, migrate_slicer_profiles.RESULT_WRITTEN)
+        expected = json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+        self.assertEqual((self.output / "process" / "profile.json").read_bytes(), expected)
+
+    def test_small_floats(self):
+        self.assert_written_like_json(
+            {"a": 2.5e-05, "b": [3.116040694369785e-05, -0.00001], "c": 0.0001}
+        )
+
+    def test_exponent_floats(self):
+        self.assert_written_like_json({"a": 1e-07, "b": 1e22})
+
+    def test_non_finite_floats(self):
+        self.assert_written_like_json({"a": math.nan, "b": [math.inf, -math.inf], "c": None})
+
+    def test_nested_and_non_ascii(self):
+        self.assert_written_like_json(
+            {"name": "Düse 0.4", "list": [{"x": 1, "y": []}, {}], "z": 0.2}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
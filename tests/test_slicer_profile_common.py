@@ -0,0 +1,68 @@
+"""Tests for the helpers shared by the migrate and update tools."""
+
+import json
+import math
+import sys
+import unittest
+from unittest import mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import slicer_profile_common  # noqa: E402
+
+
+class ParseJsonTest(unittest.TestCase):
+    """parse_json must return what json.loads returns, whatever backend is installed."""
+
+    def assert_parses_like_json(self, raw: bytes) -> None:
+        expected = json.loads(raw.decode("utf-8"))
+        actual = slicer_profile_common.parse_json(raw)
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_wide_integers_stay_integers(self):
+        for number in (
+            b"123456789012345678901234567890",
+            b"18446744073709551616",
+            b"-9223372036854775809",
+        ):
+            with self.subTest(number=number):
+                raw = b'{"id": ' + number + b"}"
+                self.assert_parses_like_json(raw)
+                self.assertIsInstance(slicer_profile_common.parse_json(raw)["id"], int)
+
+    def test_non_finite_floats(self):
+        data = slicer_profile_common.parse_json(b'{"a": NaN, "b": Infinity, "c": -Infinity}')
+        self.assertTrue(math.isnan(data["a"]))
+        self.assertEqual(data["b"], math.inf)
+        self.assertEqual(data["c"], -math.inf)
+
+    def test_non_finite_floats_with_each_backend(self):
+        backends = []
+        if slicer_profile_common.orjson is not None:
+            orjson = slicer_profile_common.orjson
+            backends.append(("orjson", orjson.loads, (orjson.JSONDecodeError,)))
+        if slicer_profile_common.msgspec is not None:
+            msgspec = slicer_profile_common.msgspec
+            backends.append(("msgspec", msgspec.json.Decoder().decode, (msgspec.DecodeError,)))
+        if not backends:
+            self.skipTest("neither orjson nor msgspec is installed")
+
+        for name, decode, errors in backends:
+            with self.subTest(backend=name), mock.patch.multiple(
+                slicer_profile_common, FAST_DECODE=decode, FAST_DECODE_ERRORS=errors
+            ):
+                data = slicer_profile_common.parse_json(b'{"a": NaN, "b": -Infinity}')
+                self.assertTrue(math.isnan(data["a"]))
+                self.assertEqual(data["b"], -math.inf)
+
+    def test_lone_surrogate_escape(self):
+        self.assert_parses_like_json(b'{"name": "\\ud800"}')
+
+    def test_invalid_json_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            slicer_profile_common.parse_json(b'{"a": ')
+
+
+if __name__ == "__main__":
+    unittest.main()
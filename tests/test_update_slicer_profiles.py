@@ -0,0 +1,37 @@
+"""Tests for update_slicer_profiles.py."""
+
+import json
+import math
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import update_slicer_profiles  # noqa: E402
+
+
+class SerializeTest(unittest.TestCase):
+    """Serialized profiles must match json.dumps(..., indent=4) byte for byte."""
+
+    def assert_serialized_like_json(self, data, ascii_only=False):
+        updater = update_slicer_profiles.ProfileUpdater(
+            Path("."), None, ascii_only=ascii_only
+        )
+        expected = json.dumps(data, indent=4, ensure_ascii=ascii_only).encode("utf-8")
+        self.assertEqual(updater._serialize(data), expected)
+
+    def test_small_floats(self):
+        self.assert_serialized_like_json({"a": 2.5e-05, "b": [-0.00001, 0.0001]})
+
+    def test_non_finite_floats(self):
+        self.assert_serialized_like_json({"a": math.nan, "b": [math.inf, -math.inf], "c": None})
+
+    def test_ascii_only(self):
+        data = {"name": "Düse 0.4", "z": 0.2}
+        self.assert_serialized_like_json(data)
+        self.assert_serialized_like_json(data, ascii_only=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,21 +8,207 @@ Supports conditional updates based on filename/filepath patterns and JSON values
 
 
 import argparse
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import operator
+import os
+import re
+import shutil
 import sys
-from fnmatch import fnmatch
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import translate
+from pathlib import Path, PurePath
+from typing import (
+    Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple,
+)
 
 try:
     import yaml
 except ImportError:
     yaml = None
 
+try:
+    # libyaml based loader, considerably faster than the pure Python one
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    YamlLoader = getattr(yaml, "SafeLoader", None)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from slicer_profile_common import (
+    dumps_like_json, iter_matching_files, match_star_glob, parse_json,
+)
+
 # Constants
 DEFAULT_CONFIG_FILE = "./profile_update.yml"
 DEFAULT_FILTER = "**/*.json"
+DEFAULT_JOBS = os.cpu_count() or 1
+# Files handed to a worker process at a time
+CHUNKSIZE = 8
+DEFAULT_CACHE_FILE = ".profile_update_cache"
+
+# Results that leave the output untouched and can be reused while neither the
+# file nor the settings change, with the reason logged for them
+CACHEABLE_RESULTS = {
+    "skipped_no_rules": "no rules matched",
+    "skipped_no_changes": "no content changes",
+}
+
+# Compiled condition: check(filename, path_str, data) -> bool, with filename
+# and path_str already passed through os.path.normcase (as fnmatch does)
+ConditionChecker = Callable[[str, str, Dict[str, Any]], bool]
+
+# (condition, checker, whether it only depends on the file name/path)
+CompiledCondition = Tuple[Dict[str, Any], ConditionChecker, bool]
+
+# Marks keys that did not exist before a rule added them
+MISSING = object()
+
+# Condition types that only look at the file name/path, not at its content
+FILE_CONDITION_TYPES = {
+    "filename_glob", "exclude_filename_glob", "filepath_glob", "exclude_filepath_glob",
+}
+
+
+class FileContext(NamedTuple):
+    """Values computed once per file and shared by all of its condition checks."""
+
+    abs_path: Path
+    # Filename and absolute path (forward slashes), normcased like fnmatch does
+    name_key: str
+    path_key: str
+    # Results of file conditions, shared by all rules
+    results: Dict[ConditionChecker, bool]
+
+
+def _compile_glob(pattern: str) -> Callable[[str], Any]:
+    """
+    Compile a glob once into a matcher for normcased names, like fnmatch.fnmatch.
+
+    Config patterns are mostly shaped like "*Kobra S1*" or "**/process/**",
+    which are matched with plain string operations. Patterns using "?" or
+    "[...]" fall back to the regex produced by fnmatch.translate.
+    """
+    pattern = os.path.normcase(pattern)
+    if "?" in pattern or "[" in pattern:
+        return re.compile(translate(pattern)).match
+    if "*" not in pattern:
+        return functools.partial(operator.eq, pattern)
+
+    # fnmatch's "*" also spans "/", so "**" is the same as "*"
+    head, *middle, tail = pattern.split("*")
+    middle = tuple(piece for piece in middle if piece)
+    min_len = len(head) + len(tail) + sum(map(len, middle))
+    return functools.partial(match_star_glob, head, middle, tail, min_len)
+
+
+# Condition checkers, bound to their operands with functools.partial. Being
+# module level functions they can be pickled along with the compiled rules.
+def _check_filename_glob(match: Callable[[str], Any], filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    return bool(match(filename))
+
+
+def _check_exclude_filename_glob(match: Callable[[str], Any], filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    return not match(filename)
+
+
+def _check_filepath_glob(match: Callable[[str], Any], filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    return bool(match(path_str))
+
+
+def _check_exclude_filepath_glob(match: Callable[[str], Any], filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    return not match(path_str)
+
+
+def _check_json_value(key: str, expected_str: str, filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    actual = data.get(key)
+    # Profile values are nearly always strings, which need no conversion
+    if type(actual) is str:
+        return actual == expected_str
+    return str(actual) == expected_str
+
+
+def _check_json_value_negated(key: str, expected_str: str, filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    # Negated: pass if values DON'T match
+    actual = data.get(key)
+    if type(actual) is str:
+        return actual != expected_str
+    return str(actual) != expected_str
+
+
+def _check_never(filename: str, path_str: str, data: Dict[str, Any]) -> bool:
+    return False
+
+
+def _check_rule(
+    file_checks: Tuple[ConditionChecker, ...],
+    data_checks: Tuple[ConditionChecker, ...],
+    filename: str,
+    path_str: str,
+    data: Dict[str, Any],
+    file_results: Dict[ConditionChecker, bool],
+) -> bool:
+    """
+    Check all conditions of a rule (AND logic), bound per rule with functools.partial.
+
+    File conditions go first, their results are shared between rules through
+    file_results, so most rules that don't apply fail on a dict lookup.
+    """
+    for check in file_checks:
+        result = file_results.get(check)
+        if result is None:
+            result = file_results[check] = check(filename, path_str, data)
+        if not result:
+            return False
+    for check in data_checks:
+        if not check(filename, path_str, data):
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=4096)
+def _transform_filename(
+    filename: str, prefix: str, postfix: str, replacements: Tuple[Tuple[str, str], ...]
+) -> str:
+    """Apply prefix, replacements, and postfix to filename."""
+    path = PurePath(filename)
+    stem = path.stem
+    suffix = path.suffix
+
+    # 1. Apply prefix
+    result = f"{prefix}{stem}"
+
+    # 2. Apply find/replace operations in order
+    for find, replace in replacements:
+        result = result.replace(find, replace)
+
+    # 3. Apply postfix
+    result = f"{result}{postfix}"
+
+    # 4. Add back the suffix
+    return f"{result}{suffix}"
+
+
+# Updater instance of a worker process, set up by _init_worker
+_worker_updater: Optional["ProfileUpdater"] = None
+
+
+def _init_worker(updater: "ProfileUpdater", debug: bool) -> None:
+    """Initialize a worker process of the update pool."""
+    global _worker_updater
+    setup_logging(debug)
+    _worker_updater = updater
+
+
+def _update_file(file_path: Path) -> str:
+    """Update a single file in a worker process."""
+    return _worker_updater._process_file(file_path)
 
 
 class ProfileUpdater:
@@ -40,6 +226,9 @@ class ProfileUpdater:
         filename_replacements: Optional[List[tuple[str, str]]] = None,
         force_copy: bool = False,
         config: Optional[Dict[str, Any]] = None,
+        jobs: int = 1,
+        cache_file: Optional[Path] = None,
+        ascii_only: bool = False,
     ):
         self.source = source.expanduser().resolve()
         self.output = output.expanduser().resolve() if output else None
@@ -48,12 +237,34 @@ class ProfileUpdater:
         self.filter_pattern = filter_pattern
         self.overwrite = overwrite
         self.sort_keys = sort_keys
+        self.ascii_only = ascii_only
         self.filename_replacements = filename_replacements or []
         self.force_copy = force_copy
-        self.config = config or {}
+        self.jobs = max(1, jobs)
+        self.cache_file = cache_file.expanduser().resolve() if cache_file else None
+        self._encode = json.JSONEncoder(
+            indent=4, ensure_ascii=ascii_only, sort_keys=sort_keys
+        ).encode
+        if orjson is not None:
+            # Dates from YAML values are left to the json module (which rejects them)
+            self._orjson_options = (
+                orjson.OPT_INDENT_2
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+            )
         self.logger = logging.getLogger(__name__)
-        self._default_conditions = self.config.get("default_conditions", [])
-        self._json_overwrite_rules = self._parse_json_overwrite_rules()
+        # Debug output of the per file hot paths is only built when enabled
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
+        # Output directories already created during this run
+        self._created_dirs: Set[Path] = set()
+        # Only the compiled rules are kept, not the whole config
+        config = config or {}
+        self._json_overwrite_rules = self._parse_json_overwrite_rules(
+            config.get("json_value_overwrite", []),
+            config.get("default_conditions", []),
+        )
+        self._rules_by_name, self._add_rule_names = self._index_rules()
+        self._config_hash = self._hash_settings(config)
 
         # Validate source/output logic
         self._validate_paths()
@@ -64,8 +275,11 @@ class ProfileUpdater:
         if not self.source.exists():
             raise ValueError(f"Source path does not exist: {self.source}")
 
+        # Checked once, the source does not change type during a run
+        self._source_is_file = self.source.is_file()
+
         # Check for invalid combinations
-        if self.source.is_file():
+        if self._source_is_file:
             # File as source
             if self.output and self.output.is_dir():
                 # File -> Directory with prefix/postfix is OK
@@ -94,27 +308,50 @@ class ProfileUpdater:
             self.logger.info(f"Prefix: '{self.prefix}', Postfix: '{self.postfix}'")
         self.logger.info(f"Rules loaded: {len(self._json_overwrite_rules)}")
 
-        # Find all matching files
+        # Logging may have been configured after __init__
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
+
+        # Matching files are streamed where possible, see _find_matching_files
         matching_files = self._find_matching_files()
-        self.logger.info(f"Found {len(matching_files)} files matching filter")
 
-        processed_count = 0
-        error_count = 0
-        skipped_no_rules = 0
-        skipped_no_changes = 0
+        # Files skipped by an earlier run with the same settings are not read
+        cache = self._load_cache() if self.cache_file else None
+        if cache is not None:
+            checked_files: List[Tuple[Path, Optional[List[int]]]] = []
+            cached_results: List[str] = []
+            matching_files = self._skip_cached_files(
+                matching_files, cache, checked_files, cached_results
+            )
 
-        for file_path in matching_files:
-            try:
-                result = self._process_json_file(file_path)
-                if result == "processed":
-                    processed_count += 1
-                elif result == "skipped_no_rules":
-                    skipped_no_rules += 1
-                elif result == "skipped_no_changes":
-                    skipped_no_changes += 1
-            except Exception as e:
-                self.logger.error(f"Error processing {file_path}: {e}", exc_info=True)
-                error_count += 1
+        # No more workers than files, look ahead as far as workers could be used
+        head = list(itertools.islice(matching_files, self.jobs))
+        matching_files = itertools.chain(head, matching_files)
+        jobs = min(self.jobs, len(head))
+
+        if jobs > 1:
+            # Files are independent, so they can be updated in parallel
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=_init_worker, initargs=(self, self._debug)
+            ) as executor:
+                results = list(
+                    executor.map(_update_file, matching_files, chunksize=CHUNKSIZE)
+                )
+        else:
+            results = [self._process_file(file_path) for file_path in matching_files]
+
+        if cache is not None:
+            for (file_path, stamp), result in zip(checked_files, results):
+                if stamp is not None and result in CACHEABLE_RESULTS:
+                    cache[str(file_path)] = [*stamp, result]
+                else:
+                    cache.pop(str(file_path), None)
+            results.extend(cached_results)
+            self._save_cache(cache)
+
+        processed_count = results.count("processed")
+        error_count = results.count("failed")
+        skipped_no_rules = results.count("skipped_no_rules")
+        skipped_no_changes = results.count("skipped_no_changes")
 
         self.logger.info(
             f"\n{'='*60}"
@@ -124,31 +361,157 @@ class ProfileUpdater:
         self.logger.info(f"  Skipped (no rules matched): {skipped_no_rules}")
         self.logger.info(f"  Skipped (no content changes): {skipped_no_changes}")
         self.logger.info(f"  Errors: {error_count}")
-        self.logger.info(f"  Total files checked: {len(matching_files)}")
+        self.logger.info(f"  Total files checked: {len(results)}")
+        if cache is not None:
+            self.logger.info(f"  Unchanged since last run: {len(cached_results)}")
         self.logger.info(
             f"{'='*60}"
         )
         return 0 if error_count == 0 else 1
 
-    def _find_matching_files(self) -> List[Path]:
-        """Find all files matching the filter pattern."""
-        if self.source.is_file():
+    def _hash_settings(self, config: Dict[str, Any]) -> str:
+        """Hash everything besides the file itself that decides whether a file is skipped."""
+        settings = [
+            config.get("json_value_overwrite", []),
+            config.get("default_conditions", []),
+            str(self.output),
+            self.prefix,
+            self.postfix,
+            self.filename_replacements,
+            self.force_copy,
+        ]
+        encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def _load_cache(self) -> Dict[str, List[Any]]:
+        """Load the results of the last run, empty if missing or made with other settings."""
+        try:
+            with open(self.cache_file, "rb") as f:
+                cache = parse_json(f.read())
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cache {self.cache_file}: {e}")
+            return {}
+
+        if not isinstance(cache, dict) or cache.get("config_hash") != self._config_hash:
+            self.logger.debug(f"Cache {self.cache_file} was made with other settings, ignoring it")
+            return {}
+        return cache.get("files", {})
+
+    def _save_cache(self, cache: Dict[str, List[Any]]) -> None:
+        """Store the cacheable results of this run for the next one."""
+        payload = json.dumps({"config_hash": self._config_hash, "files": cache})
+        tmp_path = self.cache_file.with_name(f"{self.cache_file.name}.tmp.{os.getpid()}")
+        try:
+            self._ensure_dir(self.cache_file.parent)
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            self.logger.warning(f"Failed to write cache {self.cache_file}: {e}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _skip_cached_files(
+        self,
+        paths: Iterator[Path],
+        cache: Dict[str, List[Any]],
+        checked_files: List[Tuple[Path, Optional[List[int]]]],
+        cached_results: List[str],
+    ) -> Iterator[Path]:
+        """
+        Yield the files that have to be processed, leaving out unchanged files
+        whose last result is cached.
+
+        Yielded files are recorded with their (mtime_ns, size) in checked_files,
+        results taken from the cache are added to cached_results.
+        """
+        for file_path in paths:
+            if file_path == self.cache_file:
+                continue
+
+            try:
+                st = file_path.stat()
+                stamp: Optional[List[int]] = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                stamp = None
+
+            entry = cache.get(str(file_path))
+            if (
+                stamp is not None
+                and isinstance(entry, list)
+                and entry[:2] == stamp
+                and entry[2:] and entry[2] in CACHEABLE_RESULTS
+            ):
+                result = entry[2]
+                self.logger.info(
+                    f"Skipped ({CACHEABLE_RESULTS[result]}, unchanged since last run): "
+                    f"{file_path.name}"
+                )
+                cached_results.append(result)
+                continue
+
+            checked_files.append((file_path, stamp))
+            yield file_path
+
+    def _find_matching_files(self) -> Iterator[Path]:
+        """Iterate over all files matching the filter pattern."""
+        if self._source_is_file:
             # Single file
-            return [self.source]
+            return iter([self.source])
         else:
-            # Directory - use glob
-            return [f for f in self.source.glob(self.filter_pattern) if f.is_file()]
+            # Directory - walk it with os.scandir, same matching as Path.glob
+            paths = iter_matching_files(str(self.source), self.filter_pattern)
+            if (
+                not self.output
+                or self.output == self.source
+                or self.source in self.output.parents
+            ):
+                # Output lands inside the walked tree, so list it up front to
+                # never pick up files written by this run
+                paths = list(paths)
+            return (Path(path) for path in paths)
+
+    def _process_file(self, file_path: Path) -> str:
+        """Process a single file. Returns 'failed' if an exception was raised."""
+        try:
+            return self._process_json_file(file_path)
+        except Exception as e:
+            # Include the traceback only with --debug
+            self.logger.error(
+                "Error processing %s: %s", file_path, e,
+                exc_info=self._debug,
+            )
+            return "failed"
 
     def _process_json_file(self, file_path: Path) -> str:
         """Process a single JSON file. Returns 'processed', 'skipped_no_rules', or 'skipped_no_changes'."""
-        self.logger.debug(f"\n{'='*60}")
-        self.logger.debug(f"Processing: {file_path}")
-        self.logger.debug(f"{'='*60}")
+        debug = self._debug
+        if debug:
+            self.logger.debug(f"\n{'='*60}")
+            self.logger.debug(f"Processing: {file_path}")
+            self.logger.debug(f"{'='*60}")
+
+        # Match filepath globs against the absolute path using forward slashes
+        abs_path = file_path.resolve()
+        context = FileContext(
+            abs_path=abs_path,
+            name_key=os.path.normcase(file_path.name),
+            path_key=os.path.normcase(abs_path.as_posix()),
+            results={},
+        )
+
+        # Skip files no rule can apply to before reading them
+        if not self._may_match_any_rule(context):
+            self.logger.info(f"Skipped (no rules matched): {file_path.name}")
+            if debug:
+                self.logger.debug(f"\n✗ No rules matched for {file_path.name}, skipping\n")
+            return "skipped_no_rules"
 
         # Read and parse JSON
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                original_data = json.load(f)
+            with open(file_path, "rb") as f:
+                data = parse_json(f.read())
         except json.JSONDecodeError as e:
             self.logger.error(f"Invalid JSON in {file_path}: {e}")
             return "error"
@@ -156,111 +519,207 @@ class ProfileUpdater:
             self.logger.error(f"Failed to read {file_path}: {e}")
             return "error"
 
-        # Make a copy for modification
-        import copy
-        data = copy.deepcopy(original_data)
-
-        # Apply rules
-        modified, any_rule_matched = self._apply_rules(data, file_path)
+        # Apply rules (in place, the original values of changed keys are tracked)
+        modified, any_rule_matched, content_changed = self._apply_rules(
+            data, file_path, context
+        )
 
         # Skip file if no rules matched (e.g., default_conditions filtered it out)
         if not any_rule_matched:
             self.logger.info(f"Skipped (no rules matched): {file_path.name}")
-            self.logger.debug(f"\n✗ No rules matched for {file_path.name}, skipping\n")
+            if debug:
+                self.logger.debug(f"\n✗ No rules matched for {file_path.name}, skipping\n")
             return "skipped_no_rules"
 
-        # Check if content actually changed
-        content_changed = (data != original_data)
-
         if not content_changed and not self.force_copy:
             self.logger.info(f"Skipped (no content changes): {file_path.name}")
-            self.logger.debug(f"\n✗ No content changes for {file_path.name}")
-            self.logger.debug(f"  Modified flag: {modified}")
-            self.logger.debug(f"  Any rule matched: {any_rule_matched}")
+            if debug:
+                self.logger.debug(f"\n✗ No content changes for {file_path.name}")
+                self.logger.debug(f"  Modified flag: {modified}")
+                self.logger.debug(f"  Any rule matched: {any_rule_matched}")
             return "skipped_no_changes"
 
         if not content_changed and self.force_copy:
             self.logger.info(f"Copying (forced, no content changes): {file_path.name}")
-            self.logger.debug(f"\n→ No content changes for {file_path.name}, but copying due to --force-copy")
+            if debug:
+                self.logger.debug(f"\n→ No content changes for {file_path.name}, but copying due to --force-copy")
+
+        # Computed once, both the in-place check and the write need it
+        output_path = self._get_output_path(file_path)
 
         # If not in-place (different filename), write the file
-        if not self._is_in_place_update(file_path):
-            self._write_output(file_path, data)
+        if not self._is_in_place_update(file_path, output_path):
+            # Unchanged files are copied as is unless keys must be sorted or escaped
+            copy_source = not content_changed and not self.sort_keys and not self.ascii_only
+            self._write_output(file_path, output_path, data, copy_source=copy_source)
             return "processed"
         elif content_changed:
             # In-place update only if content changed
-            self._write_output(file_path, data)
+            self._write_output(file_path, output_path, data)
             return "processed"
 
         return "skipped_no_changes"
 
-    def _is_in_place_update(self, file_path: Path) -> bool:
-        """Check if this is an in-place update."""
+    def _is_in_place_update(self, file_path: Path, output_path: Path) -> bool:
+        """Check if this is an in-place update, given the file's output path."""
         if not self.output:
             # If prefix, postfix, or replacements are set, it's not in-place
             if self.prefix or self.postfix or self.filename_replacements:
                 return False
             return True
 
-        # Calculate what the output path would be
-        output_path = self._get_output_path(file_path)
         return output_path == file_path
 
-    def _apply_rules(self, data: Dict[str, Any], file_path: Path) -> tuple[bool, bool]:
-        """Apply all matching rules to the data. Returns (modified, any_rule_matched)."""
+    def _apply_rules(
+        self,
+        data: Dict[str, Any],
+        file_path: Path,
+        context: FileContext,
+    ) -> tuple[bool, bool, bool]:
+        """
+        Apply all matching rules to the data.
+
+        Returns (modified, any_rule_matched, content_changed). content_changed
+        is False if later rules restored every value changed by earlier ones.
+        """
         modified = False
         any_rule_matched = False
+        # Values before the first change of each key (MISSING if added)
+        original_values: Dict[str, Any] = {}
 
-        self.logger.debug(f"\nEvaluating {len(self._json_overwrite_rules)} rules...")
+        rules = self._json_overwrite_rules
 
-        for rule_idx, rule in enumerate(self._json_overwrite_rules, 1):
+        # Only rules whose key exists (or that may add it) can change the data
+        candidate_names = self._rules_by_name.keys() & data.keys()
+        candidate_names |= self._add_rule_names
+        candidates = sorted(
+            idx for name in candidate_names for idx in self._rules_by_name[name]
+        )
+
+        debug = self._debug
+        if debug:
+            self.logger.debug(
+                f"\nEvaluating {len(candidates)} of {len(rules)} rules "
+                f"(others target keys not in {file_path.name})..."
+            )
+
+        for rule_idx in candidates:
+            rule = rules[rule_idx]
             name = rule["name"]
             value = rule["value"]
-            conditions = rule["conditions"]
             add = rule["add"]
 
             # Check if conditions are met
-            self.logger.debug(f"\nRule {rule_idx}/{len(self._json_overwrite_rules)}: {name}")
-            if not self._check_conditions(conditions, file_path, data):
-                self.logger.debug(f"  ✗ Conditions not met, skipping rule")
+            if debug:
+                self.logger.debug(f"\nRule {rule_idx + 1}/{len(rules)}: {name}")
+            if not self._check_conditions(rule, file_path, data, context):
+                if debug:
+                    self.logger.debug(f"  ✗ Conditions not met, skipping rule")
                 continue
 
             # At least one rule matched this file
             any_rule_matched = True
-            self.logger.debug(f"  ✓ Rule matched!")
 
             # Check if key exists
             key_exists = name in data
 
-            self.logger.debug(f"  Key '{name}' exists: {key_exists}, add: {add}")
+            if debug:
+                self.logger.debug(f"  ✓ Rule matched!")
+                self.logger.debug(f"  Key '{name}' exists: {key_exists}, add: {add}")
 
             if not key_exists and not add:
                 # Key doesn't exist and we're not allowed to add it
-                self.logger.debug(
-                    f"  → Skipping '{name}' (key not found, add=False)"
-                )
+                if debug:
+                    self.logger.debug(
+                        f"  → Skipping '{name}' (key not found, add=False)"
+                    )
                 continue
 
             # Apply the update
             old_value = data.get(name) if key_exists else None
             if old_value != value:
+                if name not in original_values:
+                    original_values[name] = old_value if key_exists else MISSING
                 data[name] = value
                 modified = True
                 action = "Updated" if key_exists else "Added"
                 self.logger.info(
                     f"{action} '{name}' in {file_path.name}"
                 )
-                self.logger.debug(f"    Old: {old_value}")
-                self.logger.debug(f"    New: {value}")
-            else:
+                if debug:
+                    self.logger.debug(f"    Old: {old_value}")
+                    self.logger.debug(f"    New: {value}")
+            elif debug:
                 self.logger.debug(f"  → Value unchanged for '{name}' (old={old_value}, new={value})")
 
-        return modified, any_rule_matched
+        if not any_rule_matched:
+            # A rule also counts as matched if its key is missing; nothing was
+            # modified at this point, so the remaining rules see the same data
+            candidate_set = set(candidates)
+            any_rule_matched = any(
+                self._check_conditions(rule, file_path, data, context)
+                for rule_idx, rule in enumerate(rules)
+                if rule_idx not in candidate_set
+            )
+
+        content_changed = any(
+            original is MISSING or data[name] != original
+            for name, original in original_values.items()
+        )
+
+        return modified, any_rule_matched, content_changed
+
+    def _may_match_any_rule(self, context: FileContext) -> bool:
+        """Check whether any rule passes its filename/filepath conditions."""
+        name_key, path_key, file_results = context.name_key, context.path_key, context.results
+
+        def passes(check: ConditionChecker) -> bool:
+            result = file_results.get(check)
+            if result is None:
+                result = file_results[check] = check(name_key, path_key, None)
+            return result
+
+        # Content conditions are not evaluated, they might pass
+        return any(
+            all(passes(check) for check in rule["file_checkers"])
+            for rule in self._json_overwrite_rules
+        )
+
+    def _index_rules(self) -> Tuple[Dict[str, List[int]], Set[str]]:
+        """Index rules by target key. Returns (rule indices by name, names with add rules)."""
+        rules_by_name: Dict[str, List[int]] = {}
+        add_rule_names: Set[str] = set()
+
+        for rule_idx, rule in enumerate(self._json_overwrite_rules):
+            rules_by_name.setdefault(rule["name"], []).append(rule_idx)
+            if rule["add"]:
+                # The key may not exist yet, so these rules are always candidates
+                add_rule_names.add(rule["name"])
+
+        return rules_by_name, add_rule_names
 
-    def _parse_json_overwrite_rules(self) -> List[Dict[str, Any]]:
+    def _parse_json_overwrite_rules(
+        self, raw_rules: List[Dict[str, Any]], default_conditions: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """Parse and validate JSON overwrite rules from config."""
         rules = []
-        raw_rules = self.config.get("json_value_overwrite", [])
+
+        # Identical file conditions share one checker, so their result can be
+        # reused between rules while processing a file
+        file_scope_checkers: Dict[Tuple[str, str], ConditionChecker] = {}
+
+        def compile_checker(condition: Dict[str, Any]) -> CompiledCondition:
+            condition_type = condition.get("type")
+            if condition_type not in FILE_CONDITION_TYPES:
+                return condition, self._compile_condition(condition), False
+            key = (condition_type, condition.get("pattern", ""))
+            check = file_scope_checkers.get(key)
+            if check is None:
+                check = file_scope_checkers[key] = self._compile_condition(condition)
+            return condition, check, True
+
+        # Default conditions are compiled once and shared by all rules
+        default_checkers = [compile_checker(condition) for condition in default_conditions]
 
         for rule in raw_rules:
             # Check if enabled (default: True)
@@ -278,104 +737,152 @@ class ProfileUpdater:
                 continue
 
             # Combine default conditions with rule-specific conditions
-            rule_conditions = rule.get("conditions", [])
-            combined_conditions = self._default_conditions + rule_conditions
-
+            rule_checkers = [
+                compile_checker(condition) for condition in rule.get("conditions", [])
+            ]
+
+            checkers = default_checkers + rule_checkers
+            # Shared file conditions are listed once
+            file_checks = tuple(dict.fromkeys(
+                check for condition, check, file_scope in checkers if file_scope
+            ))
+            data_checks = tuple(
+                check for condition, check, file_scope in checkers if not file_scope
+            )
             rules.append({
                 "name": name,
                 "value": rule["value"],
-
-                "conditions": combined_conditions,
+                # Kept for the per condition debug output
+                "checkers": checkers,
+                # Checked before the file is read
+                "file_checkers": file_checks,
+                # All conditions of the rule combined into a single call
+                "check": functools.partial(_check_rule, file_checks, data_checks),
                 "add": rule.get("add", False),
             })
 
         return rules
 
+    def _compile_condition(self, condition: Dict[str, Any]) -> ConditionChecker:
+        """Compile a condition into a checker with its operands bound once."""
+        condition_type = condition.get("type")
+
+        if condition_type == "filename_glob":
+            match = _compile_glob(condition.get("pattern", ""))
+            return functools.partial(_check_filename_glob, match)
+
+        if condition_type == "exclude_filename_glob":
+            match = _compile_glob(condition.get("pattern", ""))
+            return functools.partial(_check_exclude_filename_glob, match)
+
+        if condition_type == "filepath_glob":
+            match = _compile_glob(condition.get("pattern", ""))
+            return functools.partial(_check_filepath_glob, match)
+
+        if condition_type == "exclude_filepath_glob":
+            match = _compile_glob(condition.get("pattern", ""))
+            return functools.partial(_check_exclude_filepath_glob, match)
+
+        if condition_type == "json_value":
+            key = condition.get("key")
+            expected_value = condition.get("value")
+
+            if key is None or expected_value is None:
+                self.logger.warning(f"Invalid json_value condition: {condition}")
+                return _check_never
+
+            if condition.get("negate", False):
+                return functools.partial(_check_json_value_negated, key, str(expected_value))
+            return functools.partial(_check_json_value, key, str(expected_value))
+
+        self.logger.warning(f"Unknown condition type: {condition_type}")
+        return _check_never
+
     def _check_conditions(
-        self, conditions: List[Dict[str, Any]], file_path: Path, data: Dict[str, Any]
+        self,
+        rule: Dict[str, Any],
+        file_path: Path,
+        data: Dict[str, Any],
+        context: FileContext,
     ) -> bool:
-        """Check if all conditions are met (AND logic)."""
-        if not conditions:
+        """
+        Check if all conditions of a rule are met (AND logic).
+
+        Results of file conditions are looked up in / added to context.results.
+        """
+        if not self._debug:
+            return rule["check"](context.name_key, context.path_key, data, context.results)
+
+        # With --debug every condition is checked in config order and described
+        checkers = rule["checkers"]
+        if not checkers:
             self.logger.debug(f"  No conditions to check for {file_path.name}")
             return True
 
-        # Use absolute path for filepath_glob matching
-        abs_path = file_path.resolve()
+        name_key, path_key, file_results = context.name_key, context.path_key, context.results
 
-        self.logger.debug(f"  Checking {len(conditions)} condition(s) for {file_path.name}")
+        self.logger.debug(f"  Checking {len(checkers)} condition(s) for {file_path.name}")
         self.logger.debug(f"    Filename: {file_path.name}")
-        self.logger.debug(f"    Absolute path: {abs_path}")
-
-        for idx, condition in enumerate(conditions, 1):
-            condition_type = condition.get("type")
-
-            if condition_type == "filename_glob":
-                pattern = condition.get("pattern", "")
-                matches = fnmatch(file_path.name, pattern)
-                self.logger.debug(f"    [{idx}] filename_glob: '{pattern}' -> {matches}")
-                if not matches:
-                    return False
-
-            elif condition_type == "exclude_filename_glob":
-                pattern = condition.get("pattern", "")
-                matches = fnmatch(file_path.name, pattern)
-                self.logger.debug(f"    [{idx}] exclude_filename_glob: '{pattern}' -> excluded={matches}")
-                if matches:
-                    return False
-
-            elif condition_type == "filepath_glob":
-                pattern = condition.get("pattern", "")
-                # Match against absolute path using forward slashes
-                path_str = str(abs_path).replace("\\", "/")
-                matches = fnmatch(path_str, pattern)
-                self.logger.debug(f"    [{idx}] filepath_glob: '{pattern}' against '{path_str}' -> {matches}")
-                if not matches:
-                    return False
-
-            elif condition_type == "exclude_filepath_glob":
-                pattern = condition.get("pattern", "")
-                # Match against absolute path using forward slashes
-                path_str = str(abs_path).replace("\\", "/")
-                matches = fnmatch(path_str, pattern)
-                self.logger.debug(f"    [{idx}] exclude_filepath_glob: '{pattern}' against '{path_str}' -> excluded={matches}")
-                if matches:
-                    return False
-
-            elif condition_type == "json_value":
-                key = condition.get("key")
-                expected_value = condition.get("value")
-                negate = condition.get("negate", False)
-
-                if key is None or expected_value is None:
-                    self.logger.warning(f"Invalid json_value condition: {condition}")
-                    return False
-
-                actual_value = data.get(key)
-                matches = str(actual_value) == str(expected_value)
-
-                if negate:
-                    # Negated: pass if values DON'T match
-                    result = not matches
-                    self.logger.debug(f"    [{idx}] json_value (negated): key='{key}', expected!='{expected_value}', actual='{actual_value}' -> {result}")
-                    if not result:
-                        return False
-                else:
-                    # Normal: pass if values match
-                    self.logger.debug(f"    [{idx}] json_value: key='{key}', expected='{expected_value}', actual='{actual_value}' -> {matches}")
-                    if not matches:
-                        return False
+        self.logger.debug(f"    Absolute path: {context.abs_path}")
 
+        for idx, (condition, check, file_scope) in enumerate(checkers, 1):
+            if file_scope:
+                matches = file_results.get(check)
+                if matches is None:
+                    matches = file_results[check] = check(name_key, path_key, data)
             else:
-                self.logger.warning(f"Unknown condition type: {condition_type}")
+                matches = check(name_key, path_key, data)
+            self.logger.debug(
+                f"    [{idx}] "
+                f"{self._describe_condition(condition, matches, file_path, data, context)}"
+            )
+            if not matches:
                 return False
 
         self.logger.debug(f"  ✓ All conditions passed for {file_path.name}")
         return True
 
-    def _write_output(self, file_path: Path, data: Dict[str, Any]) -> None:
-        """Write processed JSON data to output file."""
-        output_path = self._get_output_path(file_path)
-
+    def _describe_condition(
+        self,
+        condition: Dict[str, Any],
+        matches: bool,
+        file_path: Path,
+        data: Dict[str, Any],
+        context: FileContext,
+    ) -> str:
+        """Describe a checked condition and its result for debug output."""
+        condition_type = condition.get("type")
+        pattern = condition.get("pattern", "")
+
+        if condition_type == "filename_glob":
+            return f"filename_glob: '{pattern}' -> {matches}"
+        if condition_type == "exclude_filename_glob":
+            return f"exclude_filename_glob: '{pattern}' -> excluded={not matches}"
+
+        path_str = context.abs_path.as_posix()
+        if condition_type == "filepath_glob":
+            return f"filepath_glob: '{pattern}' against '{path_str}' -> {matches}"
+        if condition_type == "exclude_filepath_glob":
+            return f"exclude_filepath_glob: '{pattern}' against '{path_str}' -> excluded={not matches}"
+
+        if condition_type == "json_value":
+            key = condition.get("key")
+            expected_value = condition.get("value")
+            actual_value = data.get(key)
+            if condition.get("negate", False):
+                return f"json_value (negated): key='{key}', expected!='{expected_value}', actual='{actual_value}' -> {matches}"
+            return f"json_value: key='{key}', expected='{expected_value}', actual='{actual_value}' -> {matches}"
+
+        return f"{condition} -> {matches}"
+
+    def _write_output(
+        self,
+        file_path: Path,
+        output_path: Path,
+        data: Dict[str, Any],
+        copy_source: bool = False,
+    ) -> None:
+        """Write processed JSON data (or a plain copy of the source) to output file."""
         # Check if we need to create the output path
         if output_path != file_path:
             # Not in-place, check overwrite flag
@@ -383,11 +890,25 @@ class ProfileUpdater:
                 self.logger.warning(f"Output file exists, skipping: {output_path}")
                 return
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(output_path.parent)
 
+        # Written next to the target and renamed over it, so an interrupted
+        # run never leaves a truncated profile behind. Symlinks are resolved
+        # first, the file they point to gets replaced, not the link.
+        target_path = Path(os.path.realpath(output_path))
+        tmp_path = target_path.with_name(f"{target_path.name}.tmp.{os.getpid()}")
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False, sort_keys=self.sort_keys)
+            if copy_source:
+                shutil.copyfile(file_path, tmp_path)
+            else:
+                with open(tmp_path, "wb") as f:
+                    f.write(self._serialize(data))
+            try:
+                # Keep the permissions of a replaced file
+                shutil.copymode(target_path, tmp_path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, target_path)
 
             if output_path == file_path:
                 self.logger.info(f"Updated (in-place): {file_path.name}")
@@ -395,24 +916,30 @@ class ProfileUpdater:
                 self.logger.info(f"Wrote: {file_path.name} -> {output_path}")
         except Exception as e:
             self.logger.error(f"Failed to write {output_path}: {e}")
+        finally:
+            # Also on KeyboardInterrupt, gone already if the rename succeeded
+            tmp_path.unlink(missing_ok=True)
+
+    def _serialize(self, data: Dict[str, Any]) -> bytes:
+        """Encode data as 4-space indented UTF-8 JSON (plain ASCII with ascii_only)."""
+        if orjson is not None:
+            buf = dumps_like_json(data, self._orjson_options)
+            # orjson can't escape non-ASCII characters
+            if buf is not None and (not self.ascii_only or buf.isascii()):
+                return buf
+        return self._encode(data).encode("ascii" if self.ascii_only else "utf-8")
+
+    def _ensure_dir(self, directory: Path) -> None:
+        """Create a directory (and parents) once per run."""
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
 
     def _apply_filename_transformations(self, filename: str) -> str:
         """Apply prefix, replacements, and postfix to filename."""
-        stem = Path(filename).stem
-        suffix = Path(filename).suffix
-
-        # 1. Apply prefix
-        result = f"{self.prefix}{stem}"
-
-        # 2. Apply find/replace operations in order
-        for find, replace in self.filename_replacements:
-            result = result.replace(find, replace)
-
-        # 3. Apply postfix
-        result = f"{result}{self.postfix}"
-
-        # 4. Add back the suffix
-        return f"{result}{suffix}"
+        return _transform_filename(
+            filename, self.prefix, self.postfix, tuple(self.filename_replacements)
+        )
 
     def _get_output_path(self, file_path: Path) -> Path:
         """Calculate the output path for a file."""
@@ -426,7 +953,7 @@ class ProfileUpdater:
             return file_path
 
         # If source is a file
-        if self.source.is_file():
+        if self._source_is_file:
             if self.output.is_dir():
                 # File -> Directory: put file in directory with transformations
                 new_name = self._apply_filename_transformations(file_path.name)
@@ -461,6 +988,21 @@ def setup_logging(debug: bool) -> None:
     )
 
 
+@functools.lru_cache(maxsize=32)
+def _load_yaml_file(config_path: Path, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Parse a YAML config file.
+
+    Cached by path and modification time, so files included from several
+    places are only parsed once. The returned dict must not be modified.
+    """
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=YamlLoader) or {}
+    except Exception as e:
+        raise ValueError(f"Failed to parse YAML in {config_path}: {e}")
+
+
 def load_config_with_includes(
     config_path: Path,
     depth: int = 0,
@@ -514,11 +1056,7 @@ def load_config_with_includes(
     if not config_path.exists():
         raise ValueError(f"Config file not found: {config_path}")
 
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            current_config = yaml.safe_load(f) or {}
-    except Exception as e:
-        raise ValueError(f"Failed to parse YAML in {config_path}: {e}")
+    current_config = _load_yaml_file(abs_path, abs_path.stat().st_mtime_ns)
 
     # Initialize merged state
     merged_rules = {}  # Key: rule["name"], Value: rule dict
@@ -801,6 +1339,32 @@ Examples:
         help="Copy files even if JSON content is unchanged (default: False)",
     )
 
+    parser.add_argument(
+        "-A", "--ascii-only",
+        action="store_true",
+        help="Escape non-ASCII characters in output JSON (default: False)",
+    )
+
+    parser.add_argument(
+        "-C", "--cache",
+        type=str,
+        nargs="?",
+        const=DEFAULT_CACHE_FILE,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Remember skipped files and don't read them again while they and the "
+            f"settings are unchanged (default file: {DEFAULT_CACHE_FILE})"
+        ),
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files processed in parallel (default: {DEFAULT_JOBS})",
+    )
+
     return parser.parse_args()
 
 
@@ -838,6 +1402,9 @@ def main() -> int:
             filename_replacements=filename_replacements,
             force_copy=args.force_copy,
             config=config,
+            jobs=args.jobs,
+            cache_file=Path(args.cache) if args.cache else None,
+            ascii_only=args.ascii_only,
         )
         return updater.run()
     except ValueError as e: